@@ -11,27 +11,137 @@ The API uses UN numeric country codes.
 API docs: https://comtradedeveloper.un.org/
 Reference data: https://comtradeapi.un.org/files/v1/app/reference/Reporters.json
 """
+import asyncio
+import base64
 import os
-import time
-from subsets_utils import get, save_raw_json, load_state, save_state
+import random
+import signal
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import BinaryIO
+import httpx
+import orjson
+import zstandard
+from subsets_utils import (
+    async_get, create_async_client, save_raw_json, open_raw_append, sync_raw_file,
+    load_state, save_state, append_state_log, load_state_log, clear_state_log,
+)
 
 # API endpoints - C=Commodities, A=Annual, HS=Harmonized System classification
 BASE_URL_PREVIEW = "https://comtradeapi.un.org/public/v1/preview/C/A/HS"  # No key required
 BASE_URL_FULL = "https://comtradeapi.un.org/data/v1/get/C/A/HS"  # Requires key
 REPORTERS_URL = "https://comtradeapi.un.org/files/v1/app/reference/Reporters.json"
 
+# Resolved once at import: use full endpoint with API key, otherwise preview endpoint.
+# The key is sent as a header on the shared client rather than as a query param.
+API_KEY = os.environ.get("COMTRADE_API_KEY")
+TRADE_URL = BASE_URL_FULL if API_KEY else BASE_URL_PREVIEW
+AUTH_HEADERS = {"Ocp-Apim-Subscription-Key": API_KEY} if API_KEY else {}
+
+# Params identical for every trade request; only reporter/period/flow vary
+STATIC_PARAMS = {
+    "cmdCode": "TOTAL",
+    "includeDesc": "true",
+}
+
 # Years available in UN Comtrade for HS classification
 # HS (Harmonized System) data starts from ~1991, earlier data uses SITC
 # We fetch 1990-present to capture everything available
 YEAR_START = 1990
 YEAR_END = 2024
 
+# Flow codes: M = imports, X = exports
+FLOWS = [("M", "imports"), ("X", "exports")]
+
+# The API accepts a comma-separated period list, so the full endpoint (100k records
+# per call) fetches several years per request. The preview endpoint caps responses
+# at 500 records - about one reporter-year - so it stays at one year per request.
+YEARS_PER_REQUEST = 5 if API_KEY else 1
+
+# Responses are silently cut off at this many records. A batched response that
+# reaches it may be missing whole years, so it is re-fetched one year at a time.
+MAX_RECORDS = 100_000 if API_KEY else 500
+
+# Requests in flight at once. Throughput is still capped by the rate limiter;
+# concurrency only overlaps response latency with the wait for the next slot.
+CONCURRENCY = 8
+
+# Keep idle pooled connections (seconds) longer than the gap between paced
+# requests, so they are reused instead of re-doing the TCP+TLS handshake
+KEEPALIVE_EXPIRY = 120
+
+# ~6 requests/minute. Free tier is ~10 req/min, but we're conservative to avoid 429s
+REQUESTS_PER_MINUTE = 6
+
+# After a 429 the request rate is halved for this long
+THROTTLE_SECONDS = 300
+
+# Backoff on 429: gentle exponential growth (5s, 6.5s, 8.5s, ...) capped at 60s,
+# so short rate-limit blips don't cost minutes of crawl time
+BACKOFF_INITIAL = 5
+BACKOFF_BASE = 1.3
+BACKOFF_MAX = 60
+MAX_RETRIES = 10
+
+# Trade files are written as zstd-compressed NDJSON. Each write appends an
+# independent frame, which decoders read back as one stream (zstd's
+# read_across_frames), so files can be extended across batches and runs.
+TRADE_EXTENSION = "ndjson.zst"
+ZSTD_LEVEL = 3
+_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+# Completed keys are appended to a state log as they finish; the full state is
+# only rewritten (and the log truncated) every CHECKPOINT_EVERY completions
+CHECKPOINT_EVERY = 50
 
-def fetch_reporters() -> list[dict]:
+
+class RateLimiter:
+    """Async limiter spacing request starts evenly: at most `rate` per `period` seconds.
+
+    Slots are tied to wall-clock time, not to when the previous request finished, so
+    a fast response is followed by the next request as soon as its slot opens. After
+    a 429, throttle() halves the rate for a while and pause() holds every task until
+    the server is ready again.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0):
+        self.interval = period / rate
+        self._next_slot = 0.0
+        self._throttled_until = 0.0
+        self._paused_until = 0.0
+
+    def throttle(self, duration: float = THROTTLE_SECONDS):
+        """Halve the request rate for the next `duration` seconds."""
+        self._throttled_until = asyncio.get_running_loop().time() + duration
+
+    def pause(self, duration: float):
+        """Start no request for the next `duration` seconds, across all tasks."""
+        until = asyncio.get_running_loop().time() + duration
+        self._paused_until = max(self._paused_until, until)
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # No await between reading and updating the slot, so this is safe across tasks
+            now = loop.time()
+            interval = self.interval * 2 if now < self._throttled_until else self.interval
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + interval
+            await asyncio.sleep(slot - now)
+            # A pause that started while we slept invalidates our slot; take a fresh,
+            # evenly spaced one after it instead of all waking at once
+            if loop.time() >= self._paused_until:
+                return
+
+
+async def fetch_reporters(client: httpx.AsyncClient) -> list[dict]:
     """Fetch the list of all reporter countries from UN Comtrade."""
     print("  Fetching reporter list...")
-    response = get(REPORTERS_URL, timeout=60)
-    data = response.json()
+    response = await async_get(client, REPORTERS_URL, timeout=60)
+    data = orjson.loads(response.content)
 
     reporters = []
     for r in data.get("results", []):
@@ -41,155 +151,432 @@ def fetch_reporters() -> list[dict]:
         # Skip group entities (like EU, ASEAN)
         if r.get("isGroup"):
             continue
+        # entryEffectiveDate is an ISO timestamp, e.g. "1900-01-01T00:00:00"
+        effective = r.get("entryEffectiveDate") or ""
         reporters.append({
             "code": r["reporterCode"],
             "name": r["reporterDesc"],
             "iso3": r.get("reporterCodeIsoAlpha3", ""),
+            "entry_year": int(effective[:4]) if effective[:4].isdigit() else YEAR_START,
         })
 
     print(f"    Found {len(reporters)} active reporters")
     return reporters
 
 
-def fetch_trade_data(reporter_code: int, year: int, flow_code: str, retry_count: int = 0) -> list[dict]:
-    """Fetch trade data for a single reporter, year, and flow direction.
+def parse_retry_after(value: str) -> float | None:
+    """Parse a Retry-After header, given either as seconds or as an HTTP date."""
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(response: httpx.Response, retry_count: int) -> float:
+    """Seconds to wait after a 429: the server's Retry-After if given, else exponential backoff.
+
+    Jitter is added either way so tasks retrying together don't return in lockstep.
+    """
+    delay = parse_retry_after(response.headers.get("Retry-After", ""))
+    if delay is None:
+        delay = min(BACKOFF_INITIAL * BACKOFF_BASE ** retry_count, BACKOFF_MAX)
+    return delay + random.uniform(0, 1)
+
+
+async def fetch_trade_data(client: httpx.AsyncClient, limiter: RateLimiter, reporter_code: int,
+                           years: tuple[int, ...], flow_code: str) -> list[dict] | None:
+    """Fetch trade data for a single reporter and flow direction over one or more years.
 
     Uses UN numeric reporter code. Fetches all partner countries for this
-    reporter-year-flow combination with TOTAL commodity aggregation.
+    reporter-years-flow combination with TOTAL commodity aggregation.
 
     Args:
+        client: Shared async HTTP client (carries the API key header, if any)
+        limiter: Shared rate limiter, acquired before every request (including retries)
         reporter_code: UN numeric country code
-        year: Year to fetch
+        years: Years to fetch, sent as one comma-separated period
         flow_code: 'M' for imports, 'X' for exports
 
     Returns bilateral trade flows: each record is reporter -> partner with
-    trade value, flow direction, and metadata.
+    trade value, flow direction, and metadata. An empty list means the API
+    confirmed there is no data; None means the request kept failing (server
+    errors, transport errors or rate limiting) and should be retried on the next run.
     """
-    api_key = os.environ.get("COMTRADE_API_KEY")
-
-    # Use full endpoint with API key, otherwise preview endpoint
-    if api_key:
-        url = BASE_URL_FULL
-    else:
-        url = BASE_URL_PREVIEW
-
     params = {
+        **STATIC_PARAMS,
         "reporterCode": str(reporter_code),
-        "period": str(year),
+        "period": ",".join(map(str, years)),
         "flowCode": flow_code,
-        "cmdCode": "TOTAL",
-        "includeDesc": "true",
     }
 
-    if api_key:
-        params["subscription-key"] = api_key
-
-    response = get(url, params=params, timeout=120)
+    # 429s and server/transport errors have separate budgets, so a run of
+    # rate limiting doesn't use up the retries meant for a flaky server
+    retry_count = 0
+    error_count = 0
+    while retry_count <= MAX_RETRIES:
+        await limiter.acquire()
+        try:
+            response = await async_get(client, TRADE_URL, params=params)
+        except httpx.TransportError as e:
+            # Timeouts and dropped connections are retried like server errors; once
+            # exhausted only this combination fails, not the whole crawl
+            print(f"    {type(e).__name__}: {e}")
+            if error_count < 3:
+                error_count += 1
+                await asyncio.sleep(10)
+                continue
+            return None
+
+        if response.status_code == 429:
+            limiter.throttle()
+            wait_time = backoff_delay(response, retry_count)
+            print(f"    Rate limited, pausing all requests for {wait_time:.0f}s...")
+            # Shared pause: the next acquire() (ours and every other task's) waits it out
+            limiter.pause(wait_time)
+            retry_count += 1
+            continue
 
-    if response.status_code == 429:
-        wait_time = min(60 * (2 ** retry_count), 300)  # Exponential backoff, max 5 min
-        print(f"    Rate limited, waiting {wait_time}s...")
-        time.sleep(wait_time)
-        return fetch_trade_data(reporter_code, year, flow_code, retry_count + 1)
+        if response.status_code == 404:
+            # No data for this reporter/year combination
+            return []
 
-    if response.status_code == 404:
-        # No data for this reporter/year combination
-        return []
+        if response.status_code != 200:
+            print(f"    HTTP {response.status_code}: {response.text[:200]}")
+            if error_count < 3:
+                error_count += 1
+                await asyncio.sleep(10)
+                continue
+            return None
 
-    if response.status_code != 200:
-        print(f"    HTTP {response.status_code}: {response.text[:200]}")
-        if retry_count < 3:
-            time.sleep(10)
-            return fetch_trade_data(reporter_code, year, flow_code, retry_count + 1)
-        return []
+        records = orjson.loads(response.content).get("data", [])
+        if len(records) >= MAX_RECORDS and len(years) > 1:
+            # Later years may have been cut off and would look empty
+            print(f"    Hit the {MAX_RECORDS:,} record cap, re-fetching year by year")
+            results = [await fetch_trade_data(client, limiter, reporter_code, (year,), flow_code)
+                       for year in years]
+            if any(result is None for result in results):
+                return None
+            return [record for result in results for record in result]
+        return records
 
-    data = response.json()
-    return data.get("data", [])
+    print(f"    Still rate limited after {MAX_RETRIES} retries")
+    return None
 
 
-def run():
-    """Fetch UN Comtrade trade data for all reporters and years.
-
-    Fetches annual trade data (HS classification, 1990-present) for all active
-    reporter countries, both imports (M) and exports (X). Data is saved per
-    reporter for memory management and incremental updates.
-
-    Rate limiting: ~6 requests/minute to stay within free tier limits.
-    Expected runtime: ~219 reporters × 35 years × 2 flows × 10s = ~42 hours for full crawl.
-    """
-    print("Fetching UN Comtrade trade data...")
+def parse_task_key(key: str) -> tuple[int, int, str]:
+    """Parse a stored '{reporter}_{year}_{flow}' key into a (reporter, year, flow) tuple."""
+    reporter_code, year, flow_code = key.split("_")
+    return int(reporter_code), int(year), flow_code
 
-    # Get list of all active reporters
-    reporters = fetch_reporters()
-    save_raw_json(reporters, "reporters")
 
-    state = load_state("comtrade")
-    completed = set(state.get("completed", []))
+def format_task_key(task: tuple[int, int, str]) -> str:
+    """Inverse of parse_task_key, used when persisting state."""
+    return "_".join(map(str, task))
 
-    # Build list of all years
-    years = list(range(YEAR_START, YEAR_END + 1))
 
-    # Flow codes: M = imports, X = exports
-    flows = [("M", "imports"), ("X", "exports")]
+class TaskBitmap:
+    """Dense bitset over (reporter, year, flow) combinations.
 
-    # Build list of reporter-year-flow combinations to fetch
-    all_tasks = [
-        (r["code"], r["name"], y, f_code, f_name)
-        for r in reporters
-        for y in years
-        for f_code, f_name in flows
-    ]
-    pending = [
-        (code, name, y, f_code, f_name)
-        for code, name, y, f_code, f_name in all_tasks
-        if f"{code}_{y}_{f_code}" not in completed
-    ]
+    Bit index is reporter_index * (n_years * n_flows) + year_offset * n_flows + flow_index,
+    with reporters in sorted code order. The full crawl (~15k combinations) fits in
+    ~2KB, so checkpoints stay tiny and membership is a single bit read. Keys for
+    reporters or years outside the bitmap are treated as absent.
+    """
 
-    total_tasks = len(all_tasks)
-    completed_count = total_tasks - len(pending)
+    def __init__(self, reporter_codes, year_start: int = YEAR_START, year_end: int = YEAR_END,
+                 flow_codes=tuple(code for code, _ in FLOWS)):
+        self.reporter_codes = sorted(reporter_codes)
+        self.year_start = year_start
+        self.year_end = year_end
+        self.flow_codes = list(flow_codes)
+        self._reporter_index = {code: i for i, code in enumerate(self.reporter_codes)}
+        self._flow_index = {code: i for i, code in enumerate(self.flow_codes)}
+        self._n_years = year_end - year_start + 1
+        self._size = len(self.reporter_codes) * self._n_years * len(self.flow_codes)
+        self.bits = bytearray((self._size + 7) // 8)
+
+    def _index(self, key: tuple[int, int, str]) -> int | None:
+        reporter_code, year, flow_code = key
+        r = self._reporter_index.get(reporter_code)
+        f = self._flow_index.get(flow_code)
+        if r is None or f is None or not self.year_start <= year <= self.year_end:
+            return None
+        return (r * self._n_years + (year - self.year_start)) * len(self.flow_codes) + f
+
+    def add(self, key: tuple[int, int, str]):
+        i = self._index(key)
+        if i is not None:
+            self.bits[i >> 3] |= 1 << (i & 7)
+
+    def __contains__(self, key: tuple[int, int, str]) -> bool:
+        i = self._index(key)
+        return i is not None and bool(self.bits[i >> 3] & (1 << (i & 7)))
+
+    def __iter__(self):
+        n_flows = len(self.flow_codes)
+        for i in range(self._size):
+            if self.bits[i >> 3] & (1 << (i & 7)):
+                r, rest = divmod(i, self._n_years * n_flows)
+                y, f = divmod(rest, n_flows)
+                yield self.reporter_codes[r], self.year_start + y, self.flow_codes[f]
+
+    def __len__(self) -> int:
+        return sum(b.bit_count() for b in self.bits)
+
+    def to_state(self) -> str:
+        return base64.b64encode(bytes(self.bits)).decode("ascii")
+
+    @classmethod
+    def from_state(cls, layout: dict, encoded: str) -> "TaskBitmap":
+        bitmap = cls(layout["reporters"], *layout["years"], layout["flows"])
+        bitmap.bits[:] = base64.b64decode(encoded)
+        return bitmap
+
+
+def load_crawl_state() -> tuple[dict, list[str]]:
+    """Load the state snapshot and any state log entries written after it."""
+    return load_state("comtrade"), load_state_log("comtrade")
+
+
+def restore_progress(state: dict, log_entries: list[str],
+                     reporter_codes: list[int]) -> tuple[TaskBitmap, TaskBitmap]:
+    """Build completed and known-empty bitmaps for the current reporter list.
+
+    The snapshot records the reporter/year/flow layout its bitmaps were built
+    with, so progress is remapped if the reporter list changes between runs.
+    Snapshots from before the bitmap format (lists of '{key}' strings) are
+    migrated. Log lines are '{key}' or '{key} empty'.
+    """
+    completed = TaskBitmap(reporter_codes)
+    empty = TaskBitmap(reporter_codes)
 
-    if not pending:
-        print("  All trade data up to date")
-        return
+    if "completed_bitmap" in state:
+        layout = state["layout"]
+        completed_keys = TaskBitmap.from_state(layout, state["completed_bitmap"])
+        empty_keys = TaskBitmap.from_state(layout, state["empty_bitmap"])
+    else:
+        completed_keys = map(parse_task_key, state.get("completed", []))
+        empty_keys = map(parse_task_key, state.get("empty", []))
+
+    for key in completed_keys:
+        completed.add(key)
+    for key in empty_keys:
+        empty.add(key)
+
+    for entry in log_entries:
+        key, _, flag = entry.partition(" ")
+        completed.add(parse_task_key(key))
+        if flag == "empty":
+            empty.add(parse_task_key(key))
+    return completed, empty
+
+
+def save_checkpoint(completed: TaskBitmap, empty: TaskBitmap):
+    """Fold the state log into a full state snapshot."""
+    save_state("comtrade", {
+        "layout": {
+            "reporters": completed.reporter_codes,
+            "years": [completed.year_start, completed.year_end],
+            "flows": completed.flow_codes,
+        },
+        "completed_bitmap": completed.to_state(),
+        "empty_bitmap": empty.to_state(),
+    })
+    clear_state_log("comtrade")
+
+
+def write_records(f: BinaryIO, records: list[dict]):
+    """Append records as one zstd frame of NDJSON, one orjson-encoded record per line.
+
+    Only called from the single writer thread, so sharing the compressor is safe.
+    """
+    f.write(_compressor.compress(b"".join(orjson.dumps(r, option=orjson.OPT_APPEND_NEWLINE) for r in records)))
+    f.flush()
 
-    print(f"  {completed_count:,}/{total_tasks:,} already completed")
-    print(f"  {len(pending):,} reporter-year-flow combinations remaining...")
-    print(f"  Estimated time: ~{len(pending) * 10 / 60:.0f} minutes at 6 req/min")
 
-    # Process by reporter to save incrementally
-    current_reporter = None
-    reporter_records = []
+def close_reporter_file(reporter_code: int, f: BinaryIO, record_count: int):
+    """Close and publish a reporter's trade file."""
+    f.close()
+    sync_raw_file(f"trade_{reporter_code}", TRADE_EXTENSION)
+    print(f"    Saved {record_count:,} records for reporter {reporter_code}")
 
-    for i, (reporter_code, reporter_name, year, flow_code, flow_name) in enumerate(pending, 1):
-        # Save previous reporter's data when switching to new reporter
-        if current_reporter is not None and reporter_code != current_reporter:
-            if reporter_records:
-                save_raw_json(reporter_records, f"trade_{current_reporter}")
-                print(f"    Saved {len(reporter_records):,} records for reporter {current_reporter}")
-            reporter_records = []
 
-        current_reporter = reporter_code
+async def fetch_task(client: httpx.AsyncClient, limiter: RateLimiter, semaphore: asyncio.Semaphore,
+                     task: tuple) -> tuple[tuple, list[dict]]:
+    """Fetch one pending task once a concurrency slot is free; returns the task with its records."""
+    reporter_code, _, years, flow_code, _ = task
+    async with semaphore:
+        return task, await fetch_trade_data(client, limiter, reporter_code, years, flow_code)
 
-        print(f"  [{i}/{len(pending)}] {reporter_name} ({reporter_code}) {year} {flow_name}...")
 
-        records = fetch_trade_data(reporter_code, year, flow_code)
+async def fetch_pending(client: httpx.AsyncClient, pending: list[tuple], completed: TaskBitmap,
+                        empty: TaskBitmap):
+    """Fetch pending reporter-years-flow requests, up to CONCURRENCY in flight.
 
-        if records:
-            reporter_records.extend(records)
-            print(f"    -> {len(records)} records")
-        else:
-            print(f"    -> no data")
+    Results are handled in completion order. Records are streamed to one trade
+    file per reporter, opened on first use and closed once the reporter's last
+    outstanding task finishes; each file is flushed before its keys are logged
+    as completed. Confirmed-empty combinations are also recorded in `empty`.
 
-        completed.add(f"{reporter_code}_{year}_{flow_code}")
-        save_state("comtrade", {"completed": list(completed)})
+    File writes, state log appends and R2 uploads run on a single background
+    writer thread so they don't stall the event loop; being one thread keeps
+    them in order, so records always land before their keys are logged.
+    """
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1)
+    limiter = RateLimiter(REQUESTS_PER_MINUTE)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    outstanding = Counter(task[0] for task in pending)
+    files: dict[int, BinaryIO] = {}
+    record_counts = Counter()
+    since_checkpoint = 0
+
+    try:
+        futures = [asyncio.create_task(fetch_task(client, limiter, semaphore, task)) for task in pending]
+        try:
+            for i, future in enumerate(asyncio.as_completed(futures), 1):
+                task, records = await future
+                reporter_code, reporter_name, years, flow_code, flow_name = task
+
+                print(f"  [{i}/{len(pending)}] {reporter_name} ({reporter_code}) {', '.join(map(str, years))} {flow_name}...")
+
+                if records:
+                    f = files.get(reporter_code)
+                    if f is None:
+                        f = files[reporter_code] = await loop.run_in_executor(
+                            writer, open_raw_append, f"trade_{reporter_code}", TRADE_EXTENSION)
+                    await loop.run_in_executor(writer, write_records, f, records)
+                    record_counts[reporter_code] += len(records)
+                    print(f"    -> {len(records)} records")
+                elif records is None:
+                    print(f"    -> failed, will retry next run")
+                else:
+                    print(f"    -> no data")
+
+                if records is not None:
+                    # A response may cover several years; route records back to their
+                    # year to tell which combinations came back empty
+                    years_with_data = {int(r["period"]) for r in records}
+                    log_entries = []
+                    for year in years:
+                        key = (reporter_code, year, flow_code)
+                        completed.add(key)
+                        if year in years_with_data:
+                            log_entries.append(format_task_key(key))
+                        else:
+                            empty.add(key)
+                            log_entries.append(f"{format_task_key(key)} empty")
+                    await loop.run_in_executor(writer, append_state_log, "comtrade", log_entries)
+                    since_checkpoint += len(years)
+
+                outstanding[reporter_code] -= 1
+                uploaded = outstanding[reporter_code] == 0 and reporter_code in files
+                if uploaded:
+                    await loop.run_in_executor(writer, close_reporter_file, reporter_code,
+                                               files.pop(reporter_code), record_counts.pop(reporter_code))
+
+                # Checkpoint straight after an upload too, so a reporter file on R2
+                # is never newer than the snapshot that marks its keys complete
+                if uploaded or since_checkpoint >= CHECKPOINT_EVERY:
+                    # Publish partial reporter files first so the snapshot never
+                    # claims records that only exist in local staging
+                    for code in files:
+                        await loop.run_in_executor(writer, sync_raw_file, f"trade_{code}", TRADE_EXTENSION)
+                    await loop.run_in_executor(writer, save_checkpoint, completed, empty)
+                    since_checkpoint = 0
+        finally:
+            for future in futures:
+                future.cancel()
+            await asyncio.gather(*futures, return_exceptions=True)
+    finally:
+        for code, f in files.items():
+            await loop.run_in_executor(writer, close_reporter_file, code, f, record_counts[code])
+        if since_checkpoint:
+            await loop.run_in_executor(writer, save_checkpoint, completed, empty)
+        writer.shutdown()
+
+
+async def crawl():
+    """Fetch the reporter list, then every reporter-year-flow not yet completed.
+
+    SIGTERM (sent by the runner on a GitHub timeout) cancels the crawl, so
+    fetch_pending's cleanup still publishes open files and checkpoints state.
+    In cloud mode the state log lives on the runner's disk and is lost with it,
+    so this is what keeps a timed-out run from dropping its latest progress.
+    """
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    # With HTTP/2 all in-flight requests multiplex over a single connection; the
+    # limits only come into play if the server falls back to HTTP/1.1
+    limits = httpx.Limits(
+        max_connections=CONCURRENCY,
+        max_keepalive_connections=CONCURRENCY,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    async with create_async_client(timeout=120, limits=limits, http2=True, headers=AUTH_HEADERS) as client:
+        # Load state (disk or R2) off the event loop while the reporter list is in flight
+        reporters_task = asyncio.create_task(fetch_reporters(client))
+        state, log_entries = await asyncio.to_thread(load_crawl_state)
+        reporters = await reporters_task
+        save_raw_json(reporters, "reporters")
+
+        completed, empty = restore_progress(state, log_entries, [r["code"] for r in reporters])
+
+        # Build list of all years
+        years = list(range(YEAR_START, YEAR_END + 1))
+
+        # Group the reporter-year-flow combinations still to fetch into requests of up to
+        # YEARS_PER_REQUEST years. Years before a reporter came into existence can't
+        # have data and are never requested.
+        pending = []
+        total_tasks = 0
+        remaining = 0
+        for r in reporters:
+            reporter_years = [y for y in years if y >= r["entry_year"]]
+            total_tasks += len(reporter_years) * len(FLOWS)
+            for f_code, f_name in FLOWS:
+                # Known-empty combinations are also marked completed, so this skips them too
+                todo = [y for y in reporter_years if (r["code"], y, f_code) not in completed]
+                remaining += len(todo)
+                for i in range(0, len(todo), YEARS_PER_REQUEST):
+                    pending.append((r["code"], r["name"], tuple(todo[i:i + YEARS_PER_REQUEST]), f_code, f_name))
+
+        if not pending:
+            print("  All trade data up to date")
+            return
+
+        print(f"  {total_tasks - remaining:,}/{total_tasks:,} already completed ({len(empty):,} known empty)")
+        print(f"  {remaining:,} reporter-year-flow combinations remaining in {len(pending):,} requests...")
+        print(f"  Estimated time: ~{len(pending) / REQUESTS_PER_MINUTE:.0f} minutes at {REQUESTS_PER_MINUTE} req/min")
+
+        await fetch_pending(client, pending, completed, empty)
 
-        # Rate limit: ~6 requests per minute (10s between requests)
-        # Free tier is ~10 req/min, but we're conservative to avoid 429s
-        time.sleep(10)
 
-    # Save final reporter's data
-    if reporter_records:
-        save_raw_json(reporter_records, f"trade_{current_reporter}")
-        print(f"    Saved {len(reporter_records):,} records for reporter {current_reporter}")
+def run():
+    """Fetch UN Comtrade trade data for all reporters and years.
 
+    Fetches annual trade data (HS classification, 1990-present) for all active
+    reporter countries, both imports (M) and exports (X). Records are appended to
+    one zstd-compressed NDJSON file per reporter (trade_{code}.ndjson.zst), so
+    memory stays bounded to a single response and re-runs extend rather than
+    overwrite earlier output.
+
+    Rate limiting: ~6 requests/minute to stay within free tier limits, with up to
+    CONCURRENCY requests in flight so response latency overlaps the pacing.
+    A request that still fails after its retries (429s, server or transport
+    errors) is skipped without being marked completed, so the rest of the crawl
+    carries on and that combination is retried on the next run.
+    Expected runtime: ~219 reporters × 35 years × 2 flows at 6 req/min = ~42 hours
+    for a full crawl on the preview tier; with an API key each request covers
+    YEARS_PER_REQUEST years, cutting that to ~9 hours.
+    """
+    print("Fetching UN Comtrade trade data...")
+    try:
+        asyncio.run(crawl())
+    except asyncio.CancelledError:
+        # Only SIGTERM cancels the crawl; keep the conventional exit code the runner expects
+        print("  Terminated, progress checkpointed")
+        sys.exit(128 + signal.SIGTERM)
     print("  Done fetching trade data")
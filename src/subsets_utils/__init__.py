@@ -1,14 +1,15 @@
-from .http_client import get, post, put, delete
-from .io import upload_data, load_state, save_state, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet, list_raw_files, raw_exists
+from .http_client import get, post, put, delete, async_get, create_async_client
+from .io import upload_data, load_state, save_state, append_state_log, load_state_log, clear_state_log, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, open_raw_append, sync_raw_file, save_raw_parquet, load_raw_parquet, list_raw_files, raw_exists
 from .environment import validate_environment, get_data_dir
 from .publish import publish
 from .testing import validate
 from . import debug
 
 __all__ = [
-    'get', 'post', 'put', 'delete',
-    'upload_data', 'load_state', 'save_state', 'load_asset', 'has_changed',
-    'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
+    'get', 'post', 'put', 'delete', 'async_get', 'create_async_client',
+    'upload_data', 'load_state', 'save_state', 'append_state_log', 'load_state_log', 'clear_state_log',
+    'load_asset', 'has_changed',
+    'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file', 'open_raw_append', 'sync_raw_file',
     'save_raw_parquet', 'load_raw_parquet', 'list_raw_files', 'raw_exists',
     'validate_environment', 'get_data_dir',
     'publish',
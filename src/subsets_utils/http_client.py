@@ -42,6 +42,24 @@ def _logged_request(method: str, url: str, **kwargs) -> httpx.Response:
         debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
 
 
+async def _logged_async_request(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Async variant of _logged_request for a caller-owned AsyncClient."""
+    start = time.time()
+    error = None
+    status = None
+
+    try:
+        response = await client.request(method, url, **kwargs)
+        status = response.status_code
+        return response
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        duration_ms = int((time.time() - start) * 1000)
+        debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
+
+
 def get(url: str, **kwargs) -> httpx.Response:
     return _logged_request("GET", url, **kwargs)
 
@@ -58,10 +76,25 @@ def delete(url: str, **kwargs) -> httpx.Response:
     return _logged_request("DELETE", url, **kwargs)
 
 
+async def async_get(client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+    return await _logged_async_request(client, "GET", url, **kwargs)
+
+
 def get_client() -> httpx.Client:
     return _get_or_create_client()
 
 
+def create_async_client(**kwargs) -> httpx.AsyncClient:
+    """Create an AsyncClient using the shared config. The caller owns (and closes) it."""
+    headers = {**_client_config['headers'], **kwargs.pop('headers', {})}
+    return httpx.AsyncClient(
+        timeout=kwargs.pop('timeout', _client_config['timeout']),
+        headers=headers,
+        follow_redirects=True,
+        **kwargs
+    )
+
+
 def configure_http(**config):
     global _client_config, _client
     _client_config.update(config)
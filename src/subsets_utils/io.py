@@ -138,11 +138,49 @@ def save_state(asset: str, state_data: dict) -> str:
         state_dir = Path(get_data_dir()) / "state"
         state_dir.mkdir(parents=True, exist_ok=True)
         state_file = state_dir / f"{asset}.json"
-        json.dump(state_data, open(state_file, 'w'), indent=2)
+        # Write-then-rename so an interrupted save never leaves a truncated state file
+        tmp_file = state_dir / f"{asset}.json.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(state_data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, state_file)
         debug.log_state_change(asset, old_state, state_data)
         return str(state_file)
 
 
+def _state_log_path(asset: str) -> Path:
+    # Always local: the log only bridges the gap between save_state checkpoints.
+    # In cloud mode it lives on the runner and is lost with it, so callers must
+    # also checkpoint on shutdown (e.g. on SIGTERM) to keep that progress.
+    path = Path(get_data_dir()) / "state" / f"{asset}.log"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def append_state_log(asset: str, entries: list[str]) -> None:
+    """Append entries to an asset's append-only state log (one per line)."""
+    if not entries:
+        return
+    with open(_state_log_path(asset), 'a', encoding='utf-8') as f:
+        f.write(''.join(f"{entry}\n" for entry in entries))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_state_log(asset: str) -> list[str]:
+    """Load entries appended since the last clear_state_log."""
+    path = _state_log_path(asset)
+    if not path.exists():
+        return []
+    return [line for line in path.read_text(encoding='utf-8').splitlines() if line]
+
+
+def clear_state_log(asset: str) -> None:
+    """Truncate the state log, once its entries are folded into save_state."""
+    _state_log_path(asset).unlink(missing_ok=True)
+
+
 # --- Raw data operations ---
 
 def _raw_path(asset_id: str, ext: str) -> Path:
@@ -191,6 +229,31 @@ def load_raw_file(asset_id: str, extension: str = "txt") -> str | bytes:
             return path.read_bytes()
 
 
+def open_raw_append(asset_id: str, extension: str = "ndjson"):
+    """Open a raw file for appending bytes, e.g. to stream NDJSON records.
+
+    In cloud mode the file is staged locally (seeded from any existing R2 copy)
+    and is only uploaded by sync_raw_file.
+    """
+    path = _raw_path(asset_id, extension)
+    if is_cloud_mode() and not path.exists():
+        existing = download_bytes(_raw_key(asset_id, extension))
+        if existing:
+            path.write_bytes(existing)
+    return open(path, 'ab')
+
+
+def sync_raw_file(asset_id: str, extension: str = "ndjson") -> str:
+    """Publish a raw file written via open_raw_append (uploads it in cloud mode)."""
+    path = _raw_path(asset_id, extension)
+    if is_cloud_mode():
+        print(f"  -> R2: Saved {asset_id}.{extension}")
+        return upload_file(str(path), _raw_key(asset_id, extension))
+    else:
+        print(f"  -> Raw Cache: Saved {asset_id}.{extension}")
+        return str(path)
+
+
 def save_raw_json(data: any, asset_id: str, compress: bool = False) -> str:
     """Save raw JSON data."""
     ext = "json.gz" if compress else "json"